@@ -1,18 +1,31 @@
+import array
+import atexit
+import bisect
 import csv
+import hashlib
+import heapq
+import itertools
 import os
-import platform
 import random
-import subprocess
-import tempfile
+import re
+import threading
 import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from tkinter import filedialog, messagebox, ttk
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
-import requests
 from tkinter import font as tkfont
 
+try:
+    import ahocorasick
+except ImportError:  # optional: highlighting falls back to a regex alternation
+    ahocorasick = None
+
+if TYPE_CHECKING:
+    import requests
+
 
 GRAMMAR_FORMS = [
     "S+不仅 + V1 + Ō, 也/还/而且 + V2 + Ó",
@@ -25,6 +38,12 @@ GRAMMAR_FORMS = [
     "跟 B 比起来 + (更 / 比较) + Adjective / Phrase",
 ]
 
+_ASTRAL_CHAR_RE = re.compile("[\U00010000-\U0010ffff]")
+_NUMBERED_LINE_RE = re.compile(r"^[^\S\n]*\d+[^\S\n]*[.)、．:：](?!\d)(.*)$", re.MULTILINE)
+_WORD_CANDIDATES = ("word", "vocab", "character")
+_TONE_CANDIDATES = ("tone", "tones")
+_TTS_CACHE_SIZE = 8
+
 
 def _load_dotenv(path: Path) -> None:
     if not path.is_file():
@@ -40,12 +59,23 @@ def _load_dotenv(path: Path) -> None:
             os.environ[key] = value
 
 
-@dataclass
+def _tk_column(astral: Sequence[int], line_start: int, offset: int) -> int:
+    # Tk 8.6 stores characters outside the BMP as surrogate pairs, so each one
+    # before the offset on its line takes up an extra column.
+    before = bisect.bisect_left(astral, offset) - bisect.bisect_left(astral, line_start)
+    return offset - line_start + before
+
+
+@dataclass(slots=True)
 class VocabularyList:
     name: str
     words: List[str] = field(default_factory=list)
-    tones: Dict[str, str] = field(default_factory=dict)
+    tones: List[str] = field(default_factory=list)
     color: str = "#2e7d32"
+    words_by_len: Tuple[str, ...] = ()
+
+
+VocabReadResult = Tuple[Optional[VocabularyList], Optional[Exception]]
 
 
 class ChineseLearningApp(tk.Tk):
@@ -66,9 +96,32 @@ class ChineseLearningApp(tk.Tk):
             family=self.chinese_font_family, size=self.sentence_font_size.get()
         )
         self.generated_sentences: List[str] = []
+        self._joined_sentences = ""
+        self._rng = random.Random()
+        self._automaton = None
+        self._vocab_pattern: Optional[re.Pattern] = None
+        self._word_lists: Dict[str, int] = {}
+        self._all_words_cache: Optional[Tuple[str, ...]] = None
+        self._tone_map: Dict[str, str] = {}
+        self._tone_words: Tuple[str, ...] = ()
+        self._vocab_version = 0
+        self._last_highlight_sig: Optional[Tuple[int, int]] = None
+        self._highlight_ranges: Dict[str, List[str]] = {}
+        self._http: Optional["requests.Session"] = None
+        self._http_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4)
+        self._io_pool = ThreadPoolExecutor(max_workers=8)
+        self._pending_requests = 0
+        self._tts_cache: Dict[str, str] = {}
+        atexit.register(self._clear_tts_cache)
 
         self._build_layout()
 
+    def destroy(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._io_pool.shutdown(wait=False, cancel_futures=True)
+        super().destroy()
+
     def _pick_chinese_font_family(self) -> str:
         candidates = [
             "Noto Serif CJK TC",
@@ -107,6 +160,8 @@ class ChineseLearningApp(tk.Tk):
         self.list_summary = ttk.Label(header, text="No vocabulary lists loaded")
         self.list_summary.pack(side=tk.RIGHT, padx=12)
 
+        self.progress = ttk.Progressbar(header, mode="indeterminate", length=120)
+
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=12, pady=12)
 
@@ -156,6 +211,10 @@ class ChineseLearningApp(tk.Tk):
 
         self.highlight_legend = ttk.Frame(frame)
         self.highlight_legend.pack(fill=tk.X)
+        self._legend_placeholder = ttk.Label(
+            self.highlight_legend, text="Load vocabulary lists to show legend."
+        )
+        self._legend_labels: List[ttk.Label] = []
 
     def _build_sentence_tab(self) -> None:
         frame = ttk.Frame(self.notebook)
@@ -305,50 +364,138 @@ class ChineseLearningApp(tk.Tk):
         if not filenames:
             return
 
+        results: Dict[int, VocabReadResult] = {}
         for index, filename in enumerate(filenames):
-            try:
-                vocab_list = self._read_vocab_file(Path(filename), index)
-            except Exception as exc:  # noqa: BLE001 - display error to user
-                messagebox.showerror("CSV Error", f"Failed to load {filename}: {exc}")
+            self._run_in_background(
+                lambda result, index=index: self._on_vocab_file_read(
+                    filenames, results, index, result
+                ),
+                self._try_read_vocab_file,
+                Path(filename),
+                index,
+                executor=self._io_pool,
+            )
+
+    def _try_read_vocab_file(self, path: Path, index: int) -> VocabReadResult:
+        try:
+            return self._read_vocab_file(path, index), None
+        except Exception as exc:  # noqa: BLE001 - display error to user
+            return None, exc
+
+    def _on_vocab_file_read(
+        self,
+        filenames: Sequence[str],
+        results: Dict[int, VocabReadResult],
+        index: int,
+        result: VocabReadResult,
+    ) -> None:
+        results[index] = result
+        if len(results) < len(filenames):
+            return
+
+        for file_idx, filename in enumerate(filenames):
+            vocab_list, error = results[file_idx]
+            if vocab_list is None:
+                messagebox.showerror("CSV Error", f"Failed to load {filename}: {error}")
                 continue
             self.vocab_lists.append(vocab_list)
+        self._on_vocab_lists_changed()
 
+    def _on_vocab_lists_changed(self) -> None:
+        self._all_words_cache = None
+        self._tone_map = {}
+        for vocab in self.vocab_lists:
+            self._tone_map.update(
+                (word, tone) for word, tone in zip(vocab.words, vocab.tones) if tone
+            )
+        self._tone_words = tuple(self._tone_map)
+        self._vocab_version += 1
+        self._reset_vocab_index()
         self._refresh_list_summary()
         self._refresh_legend()
 
     def _read_vocab_file(self, path: Path, index: int) -> VocabularyList:
-        words: List[str] = []
-        tones: Dict[str, str] = {}
-        with path.open(newline="", encoding="utf-8") as handle:
-            reader = csv.DictReader(handle)
-            if reader.fieldnames is None:
-                raise ValueError("CSV must include headers")
-            word_field = self._match_field(reader.fieldnames, ["word", "vocab", "character"])
-            tone_field = self._match_field(reader.fieldnames, ["tone", "tones"])
-
-            for row in reader:
-                word = (row.get(word_field) or "").strip()
-                if not word:
-                    continue
-                words.append(word)
-                if tone_field:
-                    tone = (row.get(tone_field) or "").strip()
-                    if tone:
-                        tones[word] = tone
+        with path.open(newline="", encoding="utf-8-sig", buffering=1 << 20) as handle:
+            words, tones = self._parse_vocab_rows(csv.reader(handle))
 
         if not words:
             raise ValueError("No words found in CSV")
 
         color = self.colors[index % len(self.colors)]
-        return VocabularyList(name=path.stem, words=words, tones=tones, color=color)
+        return VocabularyList(
+            name=path.stem,
+            words=words,
+            tones=tones,
+            color=color,
+            words_by_len=tuple(sorted(words, key=len, reverse=True)),
+        )
+
+    def _parse_vocab_rows(self, reader: Iterator[List[str]]) -> Tuple[List[str], List[str]]:
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("CSV must include headers")
+        lowered = tuple(field_name.lower() for field_name in header)
+        word_idx = self._match_field(lowered, _WORD_CANDIDATES) or 0
+        tone_idx = self._match_field(lowered, _TONE_CANDIDATES)
+
+        words: List[str] = []
+        tones: List[str] = []
+        for row in reader:
+            if len(row) <= word_idx:
+                continue
+            word = row[word_idx].strip()
+            if not word:
+                continue
+            words.append(word)
+            if tone_idx is not None and tone_idx < len(row):
+                tones.append(row[tone_idx].strip())
+            else:
+                tones.append("")
+        return words, tones
 
     @staticmethod
-    def _match_field(fieldnames: List[str], candidates: List[str]) -> str:
-        lowered = {field.lower(): field for field in fieldnames}
+    def _match_field(lowered: Tuple[str, ...], candidates: Tuple[str, ...]) -> Optional[int]:
         for candidate in candidates:
-            if candidate in lowered:
-                return lowered[candidate]
-        return fieldnames[0]
+            try:
+                return lowered.index(candidate)
+            except ValueError:
+                continue
+        return None
+
+    def _reset_vocab_index(self) -> None:
+        for vocab in self.vocab_lists:
+            self.highlight_text.tag_config(
+                self._vocab_tag(vocab), foreground=vocab.color, font=self.highlight_font
+            )
+        self._automaton = None
+        self._vocab_pattern = None
+        self._word_lists = {}
+
+    def _ensure_vocab_matcher(self) -> None:
+        if self._automaton is not None or self._vocab_pattern is not None:
+            return
+        if ahocorasick is None:
+            self._compile_vocab_pattern()
+            return
+        automaton = ahocorasick.Automaton()
+        for list_idx, vocab in enumerate(self.vocab_lists):
+            for word in vocab.words:
+                automaton.add_word(word, (list_idx, len(word)))
+        automaton.make_automaton()
+        self._automaton = automaton
+
+    def _compile_vocab_pattern(self) -> None:
+        for list_idx, vocab in enumerate(self.vocab_lists):
+            for word in vocab.words:
+                self._word_lists[word] = list_idx
+        longest_first = dict.fromkeys(
+            heapq.merge(*(v.words_by_len for v in self.vocab_lists), key=len, reverse=True)
+        )
+        self._vocab_pattern = re.compile("|".join(map(re.escape, longest_first)))
+
+    @staticmethod
+    def _vocab_tag(vocab: VocabularyList) -> str:
+        return f"vocab_{vocab.name}"
 
     def _refresh_list_summary(self) -> None:
         if not self.vocab_lists:
@@ -358,35 +505,90 @@ class ChineseLearningApp(tk.Tk):
         self.list_summary.config(text=f"Loaded: {summary}")
 
     def _refresh_legend(self) -> None:
-        for child in self.highlight_legend.winfo_children():
-            child.destroy()
+        for label in self._legend_labels[len(self.vocab_lists) :]:
+            label.pack_forget()
         if not self.vocab_lists:
-            ttk.Label(self.highlight_legend, text="Load vocabulary lists to show legend.").pack(
-                anchor=tk.W
-            )
+            self._legend_placeholder.pack(anchor=tk.W)
             return
-        for vocab in self.vocab_lists:
-            label = ttk.Label(self.highlight_legend, text=vocab.name)
-            label.pack(side=tk.LEFT, padx=6)
-            label.config(foreground=vocab.color)
+        self._legend_placeholder.pack_forget()
+        for idx, vocab in enumerate(self.vocab_lists):
+            if idx < len(self._legend_labels):
+                label = self._legend_labels[idx]
+                label.config(text=vocab.name, foreground=vocab.color)
+            else:
+                label = ttk.Label(self.highlight_legend, text=vocab.name, foreground=vocab.color)
+                self._legend_labels.append(label)
+            if not label.winfo_manager():
+                label.pack(side=tk.LEFT, padx=6)
 
     def highlight_vocab(self) -> None:
+        if (
+            self._last_highlight_sig is not None
+            and self._last_highlight_sig[1] == self._vocab_version
+            and not self.highlight_text.edit_modified()
+        ):
+            return
+
         text = self.highlight_text.get("1.0", tk.END)
-        self.highlight_text.tag_delete("vocab")
+        signature = (hash(text), self._vocab_version)
+        if signature != self._last_highlight_sig:
+            self._highlight_ranges = self._find_highlight_ranges(text)
+            self._last_highlight_sig = signature
+
         for vocab in self.vocab_lists:
-            tag = f"vocab_{vocab.name}"
-            self.highlight_text.tag_config(
-                tag, foreground=vocab.color, font=self.highlight_font
+            self.highlight_text.tag_remove(self._vocab_tag(vocab), "1.0", tk.END)
+        for tag, indices in self._highlight_ranges.items():
+            self.highlight_text.tag_add(tag, *indices)
+        self.highlight_text.edit_modified(False)
+
+    def _find_highlight_ranges(self, text: str) -> Dict[str, List[str]]:
+        ranges_by_tag: Dict[str, List[str]] = {}
+        if not self.vocab_lists:
+            return ranges_by_tag
+        self._ensure_vocab_matcher()
+
+        newlines = array.array("i", (match.start() for match in re.finditer("\n", text)))
+        astral = array.array("i", (match.start() for match in _ASTRAL_CHAR_RE.finditer(text)))
+        tags = [self._vocab_tag(vocab) for vocab in self.vocab_lists]
+        for start, end, list_idx in self._longest_matches(text):
+            ranges_by_tag.setdefault(tags[list_idx], []).extend(
+                self._text_range(newlines, astral, start, end)
             )
-            for word in sorted(vocab.words, key=len, reverse=True):
-                start = "1.0"
-                while True:
-                    start = self.highlight_text.search(word, start, tk.END)
-                    if not start:
-                        break
-                    end = f"{start}+{len(word)}c"
-                    self.highlight_text.tag_add(tag, start, end)
-                    start = end
+        return ranges_by_tag
+
+    def _longest_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        if self._automaton is None:
+            for match in self._vocab_pattern.finditer(text):
+                yield match.start(), match.end(), self._word_lists[match.group()]
+            return
+
+        matches = sorted(
+            (
+                (end_idx - word_len + 1, end_idx + 1, list_idx)
+                for end_idx, (list_idx, word_len) in self._automaton.iter(text)
+            ),
+            key=lambda match: (match[0], -match[1]),
+        )
+        last_end = 0
+        for start, end, list_idx in matches:
+            if start >= last_end:
+                yield start, end, list_idx
+                last_end = end
+
+    @staticmethod
+    def _text_range(
+        newlines: Sequence[int], astral: Sequence[int], start: int, end: int
+    ) -> Tuple[str, str]:
+        line = bisect.bisect_left(newlines, start) + 1
+        line_start = newlines[line - 2] + 1 if line > 1 else 0
+        start_index = f"{line}.{_tk_column(astral, line_start, start)}"
+        if line > len(newlines) or end <= newlines[line - 1]:
+            end_line, end_line_start = line, line_start
+        else:
+            end_line = bisect.bisect_left(newlines, end) + 1
+            end_line_start = newlines[end_line - 2] + 1
+        end_column = _tk_column(astral, end_line_start, end)
+        return start_index, f"{end_line}.{end_column}"
 
     def generate_sentences(self) -> None:
         vocab_words = self._all_words()
@@ -395,31 +597,76 @@ class ChineseLearningApp(tk.Tk):
             return
 
         sentence_count = max(1, int(self.sentence_count.get()))
-        generated: List[str] = []
-        for _ in range(sentence_count):
-            grammar = random.choice(GRAMMAR_FORMS)
-            sentence = self._generate_sentence_with_chatgpt(grammar, vocab_words)
-            generated.append(sentence)
-
-        self.generated_sentences = generated
-        self._render_sentence_output()
-
-    def _generate_sentence_with_chatgpt(self, grammar: str, vocab_words: List[str]) -> str:
+        grammars = self._rng.choices(GRAMMAR_FORMS, k=sentence_count)
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             messagebox.showwarning(
                 "Missing API Key",
                 "Set OPENAI_API_KEY to enable ChatGPT sentence generation.",
             )
-            return self._fallback_sentence(grammar, vocab_words)
+            self._show_sentences(self._fallback_sentences(grammars, vocab_words))
+            return
 
-        words = random.sample(vocab_words, k=min(3, len(vocab_words)))
+        self._run_in_background(
+            self._on_sentences_ready,
+            self._generate_sentences_with_chatgpt,
+            api_key,
+            grammars,
+            vocab_words,
+        )
+
+    def _on_sentences_ready(self, result: Tuple[List[str], int]) -> None:
+        sentences, status_code = result
+        if status_code != 200:
+            messagebox.showwarning(
+                "ChatGPT Error",
+                f"ChatGPT request failed ({status_code}). Using fallback sentences.",
+            )
+        self._show_sentences(sentences)
+
+    def _show_sentences(self, sentences: List[str]) -> None:
+        self.generated_sentences = sentences
+        self._joined_sentences = "\n".join(sentences)
+        self._render_sentence_output()
+
+    def _generate_sentences_with_chatgpt(
+        self, api_key: str, grammars: List[str], vocab_words: Sequence[str]
+    ) -> Tuple[List[str], int]:
+        items = []
+        word_groups = self._sample_word_groups(vocab_words, len(grammars))
+        for number, (grammar, words) in enumerate(zip(grammars, word_groups), start=1):
+            items.append(
+                f"{number}. Grammar pattern: {grammar}; Vocabulary words: {', '.join(words)}"
+            )
         prompt = (
-            "Create one natural Chinese sentence using the grammar pattern provided. "
-            "Include all of the vocabulary words listed. Respond with only the sentence.\n"
-            f"Grammar pattern: {grammar}\n"
-            f"Vocabulary words: {', '.join(words)}"
+            f"Create {len(grammars)} natural Chinese sentences, one for each numbered item "
+            "below. Each sentence must use its grammar pattern and include all of its "
+            "vocabulary words. Respond with only the sentences, one per line, numbered "
+            "to match.\n" + "\n".join(items)
         )
+        response = self._post_chat_completion(api_key, prompt)
+        if response.status_code != 200:
+            return self._fallback_sentences(grammars, vocab_words), response.status_code
+
+        data = response.json()
+        content = data["choices"][0]["message"]["content"]
+        lines = _NUMBERED_LINE_RE.findall(content) or content.splitlines()
+        sentences = [line.strip() for line in lines if line.strip()]
+        sentences = sentences[: len(grammars)]
+        sentences.extend(self._fallback_sentences(grammars[len(sentences) :], vocab_words))
+        return sentences, response.status_code
+
+    def _sample_word_groups(
+        self, vocab_words: Sequence[str], count: int, size: int = 3
+    ) -> List[Sequence[str]]:
+        size = min(size, len(vocab_words))
+        total = size * count
+        if total > len(vocab_words):
+            return [self._rng.sample(vocab_words, k=size) for _ in range(count)]
+        picks = self._rng.sample(vocab_words, k=total)
+        return [picks[start : start + size] for start in range(0, total, size)]
+
+    def _post_chat_completion(self, api_key: str, prompt: str) -> "requests.Response":
         payload = {
             "model": "gpt-4o-mini",
             "messages": [
@@ -428,40 +675,36 @@ class ChineseLearningApp(tk.Tk):
             ],
             "temperature": 0.7,
         }
-        response = requests.post(
+        return self._http_session(api_key).post(
             "https://api.openai.com/v1/chat/completions",
-            headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
             json=payload,
             timeout=30,
         )
-        if response.status_code != 200:
-            messagebox.showwarning(
-                "ChatGPT Error",
-                f"ChatGPT request failed ({response.status_code}). Using fallback sentence.",
-            )
-            return self._fallback_sentence(grammar, vocab_words)
-
-        data = response.json()
-        content = data["choices"][0]["message"]["content"].strip()
-        return content
 
-    def _fallback_sentence(self, grammar: str, vocab_words: List[str]) -> str:
-        words = random.sample(vocab_words, k=min(3, len(vocab_words)))
-        return f"{grammar}：{' '.join(words)}"
-
-    def _all_words(self) -> List[str]:
-        words: List[str] = []
-        for vocab in self.vocab_lists:
-            words.extend(vocab.words)
-        return words
+    def _http_session(self, api_key: str) -> "requests.Session":
+        with self._http_lock:
+            if self._http is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                self._http = requests.Session()
+                self._http.mount("https://", HTTPAdapter(pool_maxsize=8))
+            self._http.headers["Authorization"] = f"Bearer {api_key}"
+            return self._http
+
+    def _fallback_sentences(self, grammars: List[str], vocab_words: Sequence[str]) -> List[str]:
+        word_groups = self._sample_word_groups(vocab_words, len(grammars))
+        return [f"{grammar}：{' '.join(words)}" for grammar, words in zip(grammars, word_groups)]
+
+    def _all_words(self) -> Tuple[str, ...]:
+        if self._all_words_cache is None:
+            self._all_words_cache = tuple(
+                itertools.chain.from_iterable(v.words for v in self.vocab_lists)
+            )
+        return self._all_words_cache
 
     def new_quiz(self) -> None:
-        tone_entries: List[Tuple[str, str]] = []
-        for vocab in self.vocab_lists:
-            for word, tone in vocab.tones.items():
-                tone_entries.append((word, tone))
-
-        if not tone_entries:
+        if not self._tone_words:
             messagebox.showwarning(
                 "Missing Tones",
                 "Load vocabulary CSV files with a 'tone' column to enable the quiz.",
@@ -469,11 +712,17 @@ class ChineseLearningApp(tk.Tk):
             return
 
         vocab_words = self._all_words()
-        quiz_word, quiz_tone = random.choice(tone_entries)
-
-        sentence = self._generate_quiz_sentence(quiz_word, vocab_words)
-        sentence = sentence.replace(quiz_word, f"【{quiz_word}】", 1)
+        quiz_word = self._rng.choice(self._tone_words)
+        quiz_tone = self._tone_map[quiz_word]
+
+        self._run_in_background(
+            lambda sentence: self._show_quiz(quiz_word, quiz_tone, sentence),
+            self._generate_quiz_sentence,
+            quiz_word,
+            vocab_words,
+        )
 
+    def _show_quiz(self, quiz_word: str, quiz_tone: str, sentence: str) -> None:
         self.quiz_sentence.config(text=sentence)
         self.current_quiz_word = quiz_word
         self.current_quiz_tone = quiz_tone
@@ -518,19 +767,26 @@ class ChineseLearningApp(tk.Tk):
         self.sentences_output.config(state=tk.NORMAL)
         self.sentences_output.delete("1.0", tk.END)
         if self.sentence_mode.get() == "reading":
-            self.sentences_output.insert(tk.END, "\n".join(self.generated_sentences))
+            self.sentences_output.insert(tk.END, self._joined_sentences)
         self.sentences_output.config(state=tk.DISABLED)
 
     def _reveal_sentence_text(self) -> None:
         self.sentences_output.config(state=tk.NORMAL)
         self.sentences_output.delete("1.0", tk.END)
-        self.sentences_output.insert(tk.END, "\n".join(self.generated_sentences))
+        self.sentences_output.insert(tk.END, self._joined_sentences)
         self.sentences_output.config(state=tk.DISABLED)
 
     def _play_audio_sentence(self) -> None:
         if not self.generated_sentences:
             messagebox.showinfo("No Sentences", "Generate sentences first.")
             return
+        text = "。".join(self.generated_sentences)
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        cached_path = self._tts_cache.pop(key, None)
+        if cached_path is not None and os.path.exists(cached_path):
+            self._tts_cache[key] = cached_path
+            self._open_audio_file(cached_path)
+            return
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             messagebox.showwarning(
@@ -538,26 +794,70 @@ class ChineseLearningApp(tk.Tk):
                 "Set OPENAI_API_KEY to enable audio playback.",
             )
             return
-        text = "。".join(self.generated_sentences)
-        payload = {"model": "gpt-4o-mini-tts", "voice": "alloy", "input": text}
-        response = requests.post(
-            "https://api.openai.com/v1/audio/speech",
-            headers={"Authorization": f"Bearer {api_key}"},
-            json=payload,
-            timeout=30,
+        self._run_in_background(
+            lambda result: self._on_audio_ready(key, result),
+            self._download_audio,
+            api_key,
+            text,
         )
-        if response.status_code != 200:
+
+    def _on_audio_ready(self, key: str, result: Tuple[Optional[str], int]) -> None:
+        audio_path, status_code = result
+        if audio_path is None:
             messagebox.showwarning(
                 "Audio Error",
-                f"Audio request failed ({response.status_code}).",
+                f"Audio request failed ({status_code}).",
             )
             return
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as handle:
-            handle.write(response.content)
-            audio_path = handle.name
+        previous_path = self._tts_cache.pop(key, None)
+        if previous_path is not None and previous_path != audio_path:
+            self._remove_audio_file(previous_path)
+        self._tts_cache[key] = audio_path
+        while len(self._tts_cache) > _TTS_CACHE_SIZE:
+            self._remove_audio_file(self._tts_cache.pop(next(iter(self._tts_cache))))
         self._open_audio_file(audio_path)
 
+    def _clear_tts_cache(self) -> None:
+        for path in self._tts_cache.values():
+            self._remove_audio_file(path)
+        self._tts_cache.clear()
+
+    @staticmethod
+    def _remove_audio_file(path: str) -> None:
+        try:
+            os.unlink(path)
+        except OSError:  # already gone, or still open in the player on Windows
+            pass
+
+    def _download_audio(self, api_key: str, text: str) -> Tuple[Optional[str], int]:
+        import tempfile
+
+        payload = {"model": "gpt-4o-mini-tts", "voice": "alloy", "input": text}
+        response = self._http_session(api_key).post(
+            "https://api.openai.com/v1/audio/speech",
+            json=payload,
+            timeout=30,
+            stream=True,
+        )
+        with response:
+            if response.status_code != 200:
+                return None, response.status_code
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as handle:
+                try:
+                    for chunk in response.iter_content(chunk_size=65536):
+                        handle.write(chunk)
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                except BaseException:
+                    handle.close()
+                    self._remove_audio_file(handle.name)
+                    raise
+                return handle.name, response.status_code
+
     def _open_audio_file(self, path: str) -> None:
+        import platform
+        import subprocess
+
         system = platform.system().lower()
         if system == "darwin":
             subprocess.run(["open", path], check=False)
@@ -566,38 +866,64 @@ class ChineseLearningApp(tk.Tk):
         else:
             subprocess.run(["xdg-open", path], check=False)
 
-    def _generate_quiz_sentence(self, target_word: str, vocab_words: List[str]) -> str:
+    def _run_in_background(
+        self,
+        callback: Callable[[Any], None],
+        func: Callable[..., Any],
+        *args: Any,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ) -> None:
+        if self._pending_requests == 0:
+            self.progress.pack(side=tk.RIGHT, padx=12)
+            self.progress.start(10)
+        self._pending_requests += 1
+        future = (executor or self._executor).submit(func, *args)
+        future.add_done_callback(
+            lambda done: self.after(0, self._finish_background, callback, done)
+        )
+
+    def _finish_background(self, callback: Callable[[Any], None], future: Future) -> None:
+        self._pending_requests -= 1
+        if self._pending_requests == 0:
+            self.progress.stop()
+            self.progress.pack_forget()
+        try:
+            result = future.result()
+        except Exception as exc:  # noqa: BLE001 - display error to user
+            messagebox.showwarning("Request Failed", f"Background request failed: {exc}")
+            return
+        callback(result)
+
+    def _generate_quiz_sentence(self, target_word: str, vocab_words: Sequence[str]) -> str:
+        grammar = self._rng.choice(GRAMMAR_FORMS)
+        candidates = self._rng.sample(vocab_words, k=min(3, len(vocab_words)))
+        words = [word for word in candidates if word != target_word][:2]
+        target_idx = self._rng.randrange(len(words) + 1)
+        words.insert(target_idx, target_word)
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
-            return self._fallback_sentence(random.choice(GRAMMAR_FORMS), vocab_words)
-        grammar = random.choice(GRAMMAR_FORMS)
-        words = [target_word]
-        remaining = [word for word in vocab_words if word != target_word]
-        words.extend(random.sample(remaining, k=min(2, len(remaining))))
+            return self._fallback_quiz_sentence(grammar, words, target_idx)
         prompt = (
             "Create one natural Chinese sentence using the grammar pattern provided. "
             "Include all of the vocabulary words listed. Respond with only the sentence.\n"
             f"Grammar pattern: {grammar}\n"
             f"Vocabulary words: {', '.join(words)}"
         )
-        payload = {
-            "model": "gpt-4o-mini",
-            "messages": [
-                {"role": "system", "content": "You generate Chinese study sentences."},
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": 0.7,
-        }
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-            json=payload,
-            timeout=30,
-        )
+        response = self._post_chat_completion(api_key, prompt)
         if response.status_code != 200:
-            return self._fallback_sentence(grammar, vocab_words)
+            return self._fallback_quiz_sentence(grammar, words, target_idx)
         data = response.json()
-        return data["choices"][0]["message"]["content"].strip()
+        sentence = data["choices"][0]["message"]["content"].strip()
+        idx = sentence.find(target_word)
+        if idx < 0:
+            return f"{sentence} 【{target_word}】"
+        end = idx + len(target_word)
+        return f"{sentence[:idx]}【{target_word}】{sentence[end:]}"
+
+    @staticmethod
+    def _fallback_quiz_sentence(grammar: str, words: List[str], target_idx: int) -> str:
+        words[target_idx] = f"【{words[target_idx]}】"
+        return f"{grammar}：{' '.join(words)}"
 
 
 if __name__ == "__main__":